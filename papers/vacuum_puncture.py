@@ -10,11 +10,19 @@ Implements equations from:
 by Nataliya Khomyak & ChatGPT 5
 """
 
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from mpl_toolkits.mplot3d import Axes3D
 
+# Puncture profiles are shared with the simulations
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'simulations'))
+from puncture_kernels import stencil_window
+
 
 class VacuumField:
     """
@@ -25,19 +33,56 @@ class VacuumField:
     and negative (quantum foam) components.
     """
     
-    def __init__(self, size=100):
+    # Foam accumulates at a lower rate than dark energy
+    foam_coupling = 0.5
+    
+    def __init__(self, size=100, compact=False, dtype=np.float64):
         """
         Initialize a neutral vacuum field.
         
         Args:
             size: Grid size for the field
+            compact: Store only the dark energy profile; quantum foam and
+                     the net field are derived from it (read-only) on access
+            dtype: Floating point type of the stored arrays
         """
         self.size = size
-        self.field = np.zeros((size, size))  # Start in neutral equilibrium
-        self.dark_energy = np.zeros((size, size))
-        self.quantum_foam = np.zeros((size, size))
+        self.compact = compact
+        self.dtype = np.dtype(dtype)
+        self._dark_energy = np.zeros((size, size), dtype=self.dtype)
+        if not compact:
+            self._quantum_foam = np.zeros((size, size), dtype=self.dtype)
+            self._field = np.zeros((size, size), dtype=self.dtype)  # Start in neutral equilibrium
+    
+    @property
+    def dark_energy(self):
+        """Positive pressure component. Read-only view in compact mode."""
+        if self.compact:
+            view = self._dark_energy.view()
+            view.flags.writeable = False
+            return view
+        return self._dark_energy
+    
+    @property
+    def quantum_foam(self):
+        """Negative pressure component (-foam_coupling × dark energy)."""
+        if self.compact:
+            foam = -self.foam_coupling * self._dark_energy
+            foam.flags.writeable = False
+            return foam
+        return self._quantum_foam
+    
+    @property
+    def field(self):
+        """Net field: dark energy + quantum foam."""
+        if self.compact:
+            net = (1 - self.foam_coupling) * self._dark_energy
+            net.flags.writeable = False
+            return net
+        return self._field
         
-    def add_white_hole_puncture(self, x, y, strength=1.0, radius=10):
+    def add_white_hole_puncture(self, x, y, strength=1.0, radius=10,
+                                kernel='paper_gaussian'):
         """
         Add a white-hole puncture to the vacuum field.
         
@@ -49,20 +94,24 @@ class VacuumField:
             x, y: Puncture location
             strength: Puncture intensity
             radius: Affected region size
+            kernel: Profile name from puncture_kernels
+                    ('paper_gaussian' = exp(-r²/2r₀²))
         """
-        y_grid, x_grid = np.ogrid[:self.size, :self.size]
-        distance = np.sqrt((x_grid - x)**2 + (y_grid - y)**2)
-        
         # White hole creates positive pressure (dark energy)
         # Pressure falls off with distance
-        puncture_profile = strength * np.exp(-distance**2 / (2 * radius**2))
+        rows, cols, profile, _ = stencil_window(
+            (self.size, self.size), x, y, kernel, radius)
+        puncture_profile = strength * profile
         
         # Break neutrality: vacuum (0) → dark energy (+) + quantum foam (-)
-        self.dark_energy += puncture_profile
-        self.quantum_foam -= puncture_profile * 0.5  # Foam accumulates at lower rate
+        self._dark_energy[rows, cols] += puncture_profile
+        if self.compact:
+            return  # Foam and net field are derived from dark energy
+        self._quantum_foam[rows, cols] -= puncture_profile * self.foam_coupling  # Foam accumulates at lower rate
         
         # Net field remains approximately neutral
-        self.field = self.dark_energy + self.quantum_foam
+        self._field[rows, cols] = (self._dark_energy[rows, cols] +
+                                   self._quantum_foam[rows, cols])
         
     def visualize_2d(self):
         """
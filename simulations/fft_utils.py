@@ -0,0 +1,103 @@
+"""
+FFT Helpers
+Real 2D transforms shared by the spectral solvers
+
+bulk_flow_simulation (spectral gradients, windowed flows),
+velocity_statistics (spectra, correlations) and dark_matter_halo
+(Poisson solvers) all transform real fields on square grids. They use
+these helpers so the optional scipy dependency is handled in one place:
+
+    rfft2      real 2D FFT over the last two axes
+    irfft2     its inverse, back to real arrays of a given shape
+    fast_len   FFT-friendly padded length
+    spectral_gradient_plan   cached i·k multipliers for derivatives
+
+With scipy installed the transforms run on `workers` threads; without it
+they fall back to numpy's (single-threaded) FFT. Both transforms take an
+optional out= buffer. Single-threaded transforms (workers=1, or no
+scipy) on numpy >= 2 write straight into it and allocate nothing;
+threaded scipy transforms allocate their result, which is copied in.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import scipy.fft as scipy_fft  # Threaded FFTs (workers=)
+except ImportError:
+    scipy_fft = None
+
+# numpy >= 2 FFTs accept out=, so they can run in preallocated buffers
+_NUMPY_FFT_OUT = np.lib.NumpyVersion(np.__version__) >= '2.0.0'
+
+
+def _in_buffers(out, workers):
+    return out is not None and _NUMPY_FFT_OUT and (workers == 1 or scipy_fft is None)
+
+
+def rfft2(a, workers=-1, out=None):
+    """
+    Real 2D FFT over the last two axes, threaded when scipy is available.
+    
+    out: Optional complex buffer of the spectrum's shape to write into
+    """
+    if _in_buffers(out, workers):
+        return np.fft.rfft2(a, out=out)
+    if scipy_fft is not None:
+        result = scipy_fft.rfft2(a, workers=workers)
+    else:
+        result = np.fft.rfft2(a)
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def irfft2(a, shape, workers=-1, out=None):
+    """
+    Inverse of rfft2 back to real arrays of the given (N, N) shape.
+    
+    out: Optional real buffer to write into. When given, the spectrum a
+         is used as scratch space and overwritten.
+    """
+    if _in_buffers(out, workers):
+        np.fft.ifft(a, n=shape[-2], axis=-2, out=a)
+        return np.fft.irfft(a, n=shape[-1], axis=-1, out=out)
+    if scipy_fft is not None:
+        result = scipy_fft.irfft2(a, s=shape, workers=workers,
+                                  overwrite_x=out is not None)
+    else:
+        result = np.fft.irfft2(a, s=shape)
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+def fast_len(n):
+    """FFT-friendly length >= n."""
+    if scipy_fft is not None:
+        return scipy_fft.next_fast_len(n, real=True)
+    return n
+
+
+@lru_cache(maxsize=8)
+def spectral_gradient_plan(grid_size, dx):
+    """
+    Cached i·k multipliers for spectral derivatives on a periodic grid.
+    
+    Returns (ikx, iky) broadcastable against an rfft2 of shape
+    (N, N // 2 + 1). The Nyquist modes are zeroed: their derivative is
+    not representable in a real field.
+    """
+    kx = 2 * np.pi * np.fft.rfftfreq(grid_size, d=dx)
+    ky = 2 * np.pi * np.fft.fftfreq(grid_size, d=dx)
+    if grid_size % 2 == 0:
+        kx[-1] = 0
+        ky[grid_size // 2] = 0
+    ikx = (1j * kx)[None, :]
+    iky = (1j * ky)[:, None]
+    ikx.flags.writeable = False
+    iky.flags.writeable = False
+    return ikx, iky
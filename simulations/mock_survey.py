@@ -0,0 +1,260 @@
+"""
+Mock Peculiar-Velocity Surveys
+Cosmicflows-style galaxy catalogs sampled from CosmicFluid bulk flows
+
+Peculiar-velocity surveys see the bulk flow only at galaxy positions, and
+only along the line of sight. This module turns a CosmicFluid velocity
+field into such a catalog:
+
+    interpolate_velocities   (vx, vy) at arbitrary positions, bilinear or
+                             Catmull-Rom cubic, fully vectorized
+    line_of_sight_velocity   distance and radial velocity seen by an observer
+    build_mock_catalog       millions of galaxies in fixed-size chunks,
+                             streamed to one .npy file per column
+
+Catalogs are columnar directories (x.npy, y.npy, vx.npy, ...), written
+through memory maps, so a 10⁷-object catalog never needs more memory than
+one chunk, and any column can be reloaded on its own with np.load.
+"""
+
+import os
+import time
+import tempfile
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from bulk_flow_simulation import CosmicFluid
+
+
+def _axis_taps(u, n, method, periodic):
+    """
+    Interpolation taps along one axis.
+
+    Args:
+        u: Fractional grid coordinates (positions / dx)
+        n: Grid points along the axis
+        method: 'linear' (2 taps) or 'cubic' (4-tap Catmull-Rom)
+        periodic: Wrap indices around the grid instead of clamping
+
+    Returns:
+        (indices, weights), each of shape (len(u), taps)
+    """
+    if not periodic:
+        u = np.clip(u, 0, n - 1)
+    base = np.floor(u)
+    t = (u - base)[:, None]
+    base = base.astype(np.intp)
+    if method == 'linear':
+        offsets = np.arange(0, 2)
+        weights = np.hstack([1 - t, t])
+    else:
+        offsets = np.arange(-1, 3)
+        t2 = t * t
+        t3 = t2 * t
+        weights = 0.5 * np.hstack([
+            -t3 + 2 * t2 - t,
+            3 * t3 - 5 * t2 + 2,
+            -3 * t3 + 4 * t2 + t,
+            t3 - t2
+        ])
+    indices = base[:, None] + offsets
+    if periodic:
+        indices %= n
+    else:
+        np.clip(indices, 0, n - 1, out=indices)
+    return indices, weights
+
+
+def interpolate_velocities(fluid, x_mpc, y_mpc, method='linear'):
+    """
+    Peculiar velocities of the fluid at arbitrary positions.
+
+    Grid point (row i, column j) sits at (x, y) = (j·dx, i·dx), as in
+    CosmicFluid.add_vacuum_puncture. Open fluids clamp positions (and
+    cubic taps) to the grid; periodic fluids wrap them.
+
+    Args:
+        fluid: CosmicFluid (or anything with vx, vy, dx and boundary)
+        x_mpc, y_mpc: Position arrays in Mpc
+        method: 'linear' (bilinear) or 'cubic' (Catmull-Rom bicubic)
+
+    Returns:
+        (vx, vy) arrays in km/s, one value per position
+    """
+    if method not in ('linear', 'cubic'):
+        raise ValueError(f"method must be 'linear' or 'cubic', not {method!r}")
+    periodic = getattr(fluid, 'boundary', 'open') == 'periodic'
+    n_rows, n_cols = fluid.vx.shape
+    cols, wx = _axis_taps(np.asarray(x_mpc, dtype=float).ravel() / fluid.dx,
+                          n_cols, method, periodic)
+    rows, wy = _axis_taps(np.asarray(y_mpc, dtype=float).ravel() / fluid.dx,
+                          n_rows, method, periodic)
+    flat_vx = fluid.vx.ravel()
+    flat_vy = fluid.vy.ravel()
+
+    vx = np.zeros(len(cols))
+    vy = np.zeros(len(cols))
+    for a in range(rows.shape[1]):
+        row_offset = rows[:, a] * n_cols
+        for b in range(cols.shape[1]):
+            index = row_offset + cols[:, b]
+            weight = wy[:, a] * wx[:, b]
+            vx += weight * flat_vx[index]
+            vy += weight * flat_vy[index]
+    shape = np.shape(x_mpc)
+    return vx.reshape(shape), vy.reshape(shape)
+
+
+def line_of_sight_velocity(x_mpc, y_mpc, vx, vy, observer):
+    """
+    Distance and radial peculiar velocity seen from an observer.
+
+    Args:
+        x_mpc, y_mpc: Galaxy positions in Mpc
+        vx, vy: Galaxy peculiar velocities in km/s
+        observer: (x, y) of the observer in Mpc
+
+    Returns:
+        (distance, v_los): distance in Mpc and v·r̂ in km/s (positive =
+        receding); galaxies at the observer get v_los = 0
+    """
+    rx = x_mpc - observer[0]
+    ry = y_mpc - observer[1]
+    distance = np.hypot(rx, ry)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        v_los = np.where(distance > 0, (vx * rx + vy * ry) / distance, 0.0)
+    return distance, v_los
+
+
+def _position_chunks(positions, physical_size, chunk_size, rng):
+    """
+    Total object count and a generator of (x, y) chunks.
+
+    positions may be an object count (uniform random positions), an
+    (N, 2) array, a .npy file holding one, or a catalog directory with
+    x.npy / y.npy columns. Files are memory-mapped, never fully loaded.
+    """
+    if isinstance(positions, (int, np.integer)):
+        rng = np.random.default_rng(rng)
+        n_objects = int(positions)
+
+        def chunks():
+            for start in range(0, n_objects, chunk_size):
+                n = min(chunk_size, n_objects - start)
+                yield (rng.uniform(0, physical_size, n),
+                       rng.uniform(0, physical_size, n))
+        return n_objects, chunks()
+
+    if isinstance(positions, (str, os.PathLike)):
+        if os.path.isdir(positions):
+            x = np.load(os.path.join(positions, 'x.npy'), mmap_mode='r')
+            y = np.load(os.path.join(positions, 'y.npy'), mmap_mode='r')
+            columns = (x, y)
+        else:
+            array = np.load(positions, mmap_mode='r')
+            columns = (array[:, 0], array[:, 1])
+    else:
+        array = np.asarray(positions)
+        columns = (array[:, 0], array[:, 1])
+
+    n_objects = len(columns[0])
+
+    def chunks():
+        for start in range(0, n_objects, chunk_size):
+            yield (np.asarray(columns[0][start:start + chunk_size], dtype=float),
+                   np.asarray(columns[1][start:start + chunk_size], dtype=float))
+    return n_objects, chunks()
+
+
+def build_mock_catalog(fluid, positions, output_dir, observer=None, method='linear',
+                       chunk_size=2**20, dtype=np.float32, rng=None):
+    """
+    Sample a mock peculiar-velocity catalog and stream it to disk.
+
+    Args:
+        fluid: CosmicFluid to sample
+        positions: Number of galaxies to place uniformly at random, an
+                   (N, 2) array of positions in Mpc, a .npy file holding
+                   one, or a catalog directory with x.npy / y.npy
+        output_dir: Directory for the columns (created if missing)
+        observer: (x, y) in Mpc; adds 'distance' and 'v_los' columns
+        method: 'linear' or 'cubic' interpolation
+        chunk_size: Galaxies interpolated and written per chunk
+        dtype: Column dtype on disk
+        rng: Generator or seed for random positions (default: unseeded)
+
+    Returns:
+        Dictionary column name -> read-only memory-mapped array
+    """
+    n_objects, chunks = _position_chunks(positions, fluid.physical_size,
+                                         chunk_size, rng)
+    names = ['x', 'y', 'vx', 'vy']
+    if observer is not None:
+        names += ['distance', 'v_los']
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, f'{name}.npy') for name in names}
+    if isinstance(positions, (str, os.PathLike)):
+        outputs = {os.path.abspath(output_dir)}
+        outputs.update(os.path.abspath(path) for path in paths.values())
+        if os.path.abspath(positions) in outputs:
+            raise ValueError("output_dir would overwrite the input positions")
+    columns = {name: open_memmap(paths[name], mode='w+', dtype=dtype,
+                                 shape=(n_objects,))
+               for name in names}
+
+    start = 0
+    for x, y in chunks:
+        stop = start + len(x)
+        vx, vy = interpolate_velocities(fluid, x, y, method)
+        values = {'x': x, 'y': y, 'vx': vx, 'vy': vy}
+        if observer is not None:
+            values['distance'], values['v_los'] = line_of_sight_velocity(
+                x, y, vx, vy, observer)
+        for name in names:
+            columns[name][start:stop] = values[name]
+        start = stop
+
+    for column in columns.values():
+        column.flush()
+    del columns
+    return {name: np.load(paths[name], mmap_mode='r') for name in names}
+
+
+def demonstrate_mock_survey(n_galaxies=10**6):
+    """
+    Build a mock Cosmicflows-style catalog from a multi-puncture flow.
+    """
+    print("\n" + "="*70)
+    print("MOCK PECULIAR-VELOCITY SURVEY")
+    print(f"{n_galaxies:,} galaxies observed from the box center")
+    print("="*70)
+
+    fluid = CosmicFluid(grid_size=150, physical_size_mpc=750)
+    for x, y, strength, radius in [(150, 150, 0.12, 60), (550, 200, 0.15, 70),
+                                   (400, 550, 0.10, 55), (200, 500, 0.13, 65),
+                                   (600, 600, 0.11, 58)]:
+        fluid.add_vacuum_puncture(x, y, strength, radius)
+    fluid.advance(100, dt_myr=10, coupling_strength=1000)
+
+    observer = (375, 375)
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        catalog = build_mock_catalog(fluid, n_galaxies, output_dir,
+                                     observer=observer, method='cubic', rng=0)
+        elapsed = time.perf_counter() - start
+        print(f"\nSampled and wrote {n_galaxies:,} galaxies in {elapsed:.2f} s")
+
+        distance = np.asarray(catalog['distance'])
+        v_los = np.asarray(catalog['v_los'])
+        print("\n  Shell (Mpc)   N galaxies   rms v_los (km/s)")
+        for lo in range(0, 375, 75):
+            shell = (distance >= lo) & (distance < lo + 75)
+            rms = np.sqrt(np.mean(v_los[shell]**2))
+            print(f"  {lo:4d}-{lo + 75:<4d}    {np.sum(shell):10,d}   {rms:10.0f}")
+        del catalog, distance, v_los
+
+
+if __name__ == "__main__":
+    demonstrate_mock_survey()
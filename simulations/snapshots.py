@@ -0,0 +1,557 @@
+"""
+Simulation Snapshots
+Background, chunked on-disk time series of simulation fields
+
+Long runs need the evolution of their fields, but keeping every frame in
+memory does not scale and writing frames synchronously stalls the step
+loop on disk. This module splits the job:
+
+    Snapshotter      decides when a frame is due (every k steps and/or
+                     every t seconds of wall clock), keeps the most recent
+                     frames in a bounded ring buffer and hands frames to
+    SnapshotWriter   a background thread appending them to chunked .npy
+                     memory maps ({field}_{chunk:05d}.npy + index.npz)
+    SnapshotArchive  reads a snapshot directory back, frame by frame
+
+Frames are copied once when captured; the ring buffer and the writer
+share that copy, so the simulation is free to keep mutating its arrays.
+
+History sinks are the simpler interface used by DarkMatterHalo.history:
+anything with append(frame) where frame is a dictionary of arrays and
+scalars. Sinks that drop frames also provide wants_frame() and skip(),
+so the simulation copies its fields only for frames that are kept. A
+plain list keeps every frame; alternatives bound the memory:
+
+    NullSink              keeps nothing
+    DecimatedSink(k)      keeps every k-th frame in memory
+    deque(maxlen=K)       ring buffer of the last K frames
+    CompressedFrameSink   every frame on disk, XOR-delta encoded against
+                          the previous frame and zlib-compressed on a
+                          background thread (CompressedFrameArchive
+                          reads it back)
+    ScalarSeries          growable columns for per-step scalars
+"""
+
+import os
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+class _BackgroundWriter:
+    """
+    Runs _append(*payload) for queued frames on a daemon thread.
+    
+    Subclasses implement _append and _sync(trim); flush() and close()
+    run _sync on the writer thread once every earlier frame is written.
+    Errors raised there are re-raised in the caller on the next call.
+    """
+
+    def __init__(self, max_pending=None, name='snapshot-writer'):
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_pending or 0)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            command, payload = self._queue.get()
+            try:
+                if self._error is None:
+                    if command == 'frame':
+                        self._append(*payload)
+                    elif command in ('flush', 'close'):
+                        self._sync(trim=command == 'close')
+            except BaseException as error:  # Reported to the caller by _check
+                self._error = error
+            finally:
+                if command != 'frame':
+                    payload.set()
+                self._queue.task_done()
+            if command == 'close':
+                return
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f"Snapshot writer failed: {self._error!r}") from self._error
+
+    def _put(self, *payload):
+        self._check()
+        if not self._thread.is_alive():
+            raise RuntimeError("Snapshot writer is closed")
+        self._queue.put(('frame', payload))
+
+    def _wait(self, command):
+        if self._thread.is_alive():
+            done = threading.Event()
+            self._queue.put((command, done))
+            done.wait()
+        self._check()
+
+    def flush(self):
+        """Block until every queued frame is on disk and the index is current."""
+        self._wait('flush')
+
+    def close(self):
+        """Write the remaining frames, finalize the files and stop the thread."""
+        self._wait('close')
+        self._thread.join()
+
+
+class SnapshotWriter(_BackgroundWriter):
+    """
+    Appends frames to chunked memory-mapped files on a background thread.
+
+    Each field is stored as a sequence of chunk files holding chunk_frames
+    frames; index.npz records the step and time of every frame. The
+    index is rewritten whenever a chunk fills up and on flush / close, so
+    a crashed run loses at most the frames since then.
+    """
+
+    def __init__(self, output_dir, chunk_frames=64, dtype=None, max_pending=None):
+        """
+        Args:
+            output_dir: Directory for the chunk files (created if missing)
+            chunk_frames: Frames per chunk file
+            dtype: On-disk dtype (default: each field's own dtype)
+            max_pending: Frames allowed to queue up before write() blocks
+                         (default: unbounded, write() never waits on disk)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.chunk_frames = chunk_frames
+        self.dtype = dtype
+
+        self.steps = []
+        self.times = []
+        self._chunk = {}      # Field name -> open memmap of the current chunk
+        self._fields = None   # Field names, fixed by the first frame
+        super().__init__(max_pending)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _chunk_path(self, name, chunk):
+        return os.path.join(self.output_dir, f'{name}_{chunk:05d}.npy')
+
+    def _append(self, step, time_value, frame):
+        if self._fields is None:
+            self._fields = sorted(frame)
+        slot = len(self.steps) % self.chunk_frames
+        if slot == 0:
+            chunk = len(self.steps) // self.chunk_frames
+            for name in self._fields:
+                array = frame[name]
+                self._chunk[name] = open_memmap(
+                    self._chunk_path(name, chunk), mode='w+',
+                    dtype=self.dtype or array.dtype,
+                    shape=(self.chunk_frames,) + array.shape)
+        for name in self._fields:
+            self._chunk[name][slot] = frame[name]
+        self.steps.append(step)
+        self.times.append(time_value)
+        if slot == self.chunk_frames - 1:
+            self._sync()
+            self._chunk = {}
+
+    def _sync(self, trim=False):
+        """Flush the open chunk and rewrite the index; trim a partial last chunk."""
+        filled = len(self.steps) % self.chunk_frames
+        for chunk in self._chunk.values():
+            chunk.flush()
+        if trim:
+            chunks, self._chunk = self._chunk, {}
+            while filled and chunks:
+                _, chunk = chunks.popitem()
+                path = chunk.filename
+                partial = np.array(chunk[:filled])
+                del chunk  # Release the map before replacing its file
+                np.save(path + '.tmp.npy', partial)
+                os.replace(path + '.tmp.npy', path)
+        np.savez(os.path.join(self.output_dir, 'index.npz'),
+                 step=np.asarray(self.steps), time=np.asarray(self.times, dtype=float),
+                 fields=np.asarray(self._fields or [], dtype=str),
+                 chunk_frames=self.chunk_frames)
+
+    def write(self, step, time_value, frame):
+        """
+        Queue a frame for writing.
+
+        Args:
+            step: Step number of the frame
+            time_value: Simulation time of the frame
+            frame: Dictionary field name -> array. The arrays are written
+                   later, on the writer thread, so they must not be
+                   modified afterwards (pass copies).
+        """
+        self._put(step, time_value, frame)
+
+
+class Snapshotter:
+    """
+    Snapshot cadence, recent-frame ring buffer and optional disk writer.
+    """
+
+    def __init__(self, every_steps=None, every_seconds=None, ring_size=16,
+                 output_dir=None, chunk_frames=64, dtype=None, max_pending=None):
+        """
+        Args:
+            every_steps: Capture every k-th step
+            every_seconds: Capture when this much wall-clock time has passed
+                           since the last capture (either trigger suffices)
+            ring_size: Most recent frames kept in memory
+            output_dir: Directory for a SnapshotWriter (default: memory only)
+            chunk_frames, dtype, max_pending: As SnapshotWriter
+        """
+        if every_steps is None and every_seconds is None:
+            raise ValueError("Specify every_steps and/or every_seconds")
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.recent = deque(maxlen=ring_size)
+        self.writer = None
+        if output_dir is not None:
+            self.writer = SnapshotWriter(output_dir, chunk_frames=chunk_frames,
+                                         dtype=dtype, max_pending=max_pending)
+        self._last_capture = time.monotonic()
+
+    def steps_until_due(self, step):
+        """Steps after `step` until the step cadence next fires (None if unset)."""
+        if self.every_steps is None:
+            return None
+        return self.every_steps - step % self.every_steps
+
+    def due(self, step):
+        """Whether a frame should be captured at this step."""
+        if self.every_steps is not None and step % self.every_steps == 0:
+            return True
+        return (self.every_seconds is not None and
+                time.monotonic() - self._last_capture >= self.every_seconds)
+
+    def capture(self, step, time_value, arrays):
+        """
+        Copy the arrays into a frame, keep it in the ring buffer and queue
+        it for the writer.
+
+        Returns:
+            The frame: {'step', 'time', **copied arrays}
+        """
+        copies = {name: np.array(array) for name, array in arrays.items()}
+        self.recent.append({'step': step, 'time': time_value, **copies})
+        if self.writer is not None:
+            self.writer.write(step, time_value, copies)
+        self._last_capture = time.monotonic()
+        return self.recent[-1]
+
+    def maybe_capture(self, step, time_value, arrays):
+        """capture() if a frame is due at this step."""
+        if self.due(step):
+            self.capture(step, time_value, arrays)
+
+    def flush(self):
+        """Block until every captured frame is on disk."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """Finalize the snapshot files (the ring buffer stays readable)."""
+        if self.writer is not None:
+            self.writer.close()
+
+
+class SnapshotArchive:
+    """
+    Read-only view of a SnapshotWriter directory.
+
+    archive[i] returns frame i as a dictionary of memory-mapped arrays;
+    archive.steps / archive.times index the frames.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        with np.load(os.path.join(output_dir, 'index.npz')) as index:
+            self.steps = index['step']
+            self.times = index['time']
+            self.fields = [str(name) for name in index['fields']]
+            self.chunk_frames = int(index['chunk_frames'])
+        self._chunks = {}
+
+    def __len__(self):
+        return len(self.steps)
+
+    def _chunk(self, name, chunk):
+        key = (name, chunk)
+        if key not in self._chunks:
+            path = os.path.join(self.output_dir, f'{name}_{chunk:05d}.npy')
+            self._chunks[key] = np.load(path, mmap_mode='r')
+        return self._chunks[key]
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"frame {i} out of range for {len(self)} frames")
+        chunk, slot = divmod(i, self.chunk_frames)
+        frame = {'step': self.steps[i], 'time': self.times[i]}
+        for name in self.fields:
+            frame[name] = self._chunk(name, chunk)[slot]
+        return frame
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class NullSink:
+    """History sink that keeps nothing."""
+
+    def wants_frame(self):
+        """False: callers need not build frames at all."""
+        return False
+
+    def skip(self):
+        pass
+
+    def append(self, frame):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+
+class DecimatedSink(list):
+    """
+    History sink keeping every k-th appended frame (the 1st, k+1-th, ...).
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self.seen = 0
+
+    def wants_frame(self):
+        """Whether the next frame will be kept (else call skip())."""
+        return self.seen % self.every == 0
+
+    def skip(self):
+        """Count a frame that was never built."""
+        self.seen += 1
+
+    def append(self, frame):
+        if self.wants_frame():
+            super().append(frame)
+        self.seen += 1
+
+
+class ScalarSeries:
+    """
+    Growable named columns of scalars (one row per append).
+
+    Storage doubles when full, so appends are amortized O(1) and a long
+    run's series costs a few bytes per step instead of a list of dicts.
+    series['name'] is a view of the filled part of a column.
+    """
+
+    def __init__(self, names, capacity=1024):
+        self.names = tuple(names)
+        self._data = np.empty((len(self.names), capacity))
+        self._n = 0
+
+    def append(self, *values):
+        if self._n == self._data.shape[1]:
+            grown = np.empty((len(self.names), 2 * self._n))
+            grown[:, :self._n] = self._data
+            self._data = grown
+        self._data[:, self._n] = values
+        self._n += 1
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, name):
+        return self._data[self.names.index(name), :self._n]
+
+
+def _bits(array):
+    """View of an array's values as unsigned integers of the same width."""
+    array = np.ascontiguousarray(array)
+    return array.view(np.dtype(f'u{array.dtype.itemsize}'))
+
+
+class CompressedFrameSink(_BackgroundWriter):
+    """
+    Disk-backed history sink with delta-encoded, compressed frames.
+
+    Array fields are stored bit-exactly as the XOR of their bit patterns
+    with the previous frame; between slowly evolving frames most high
+    bits cancel and the deltas compress well. Every chunk_frames-th frame
+    is a keyframe stored whole, so each chunk file (frames_{chunk:05d}.bin,
+    concatenated zlib blocks) decodes on its own. Scalar fields go to
+    index.npz with the block offsets. Encoding runs on a background
+    thread. At most max_pending frames wait in its queue; when zlib
+    falls behind, append() blocks until one is encoded. Memory use is
+    therefore bounded by max_pending + 2 frames (the queue, the frame
+    being encoded and the previous frame it is delta-encoded against).
+    """
+
+    def __init__(self, output_dir, chunk_frames=32, every=1, level=1,
+                 max_pending=8):
+        """
+        Args:
+            output_dir: Directory for the chunk files (created if missing)
+            chunk_frames: Frames per chunk (one keyframe each)
+            every: Keep every k-th appended frame
+            level: zlib compression level (1 = fastest)
+            max_pending: Frames allowed to queue up before append() blocks
+                         (None = unbounded)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.chunk_frames = chunk_frames
+        self.every = every
+        self.level = level
+        self.seen = 0
+        self.queued = 0
+
+        self._fields = None     # Array fields: name -> (dtype str, shape)
+        self._scalars = None    # Scalar field names
+        self._blocks = []       # Per frame: [(offset, length)] per array field
+        self._scalar_rows = []  # Per frame: scalar values
+        self._file = None
+        self._previous = {}
+        super().__init__(max_pending, name='history-writer')
+
+    def __len__(self):
+        return self.queued
+
+    def wants_frame(self):
+        """Whether the next frame will be kept (else call skip())."""
+        return self.seen % self.every == 0
+
+    def skip(self):
+        """Count a frame that was never built."""
+        self.seen += 1
+
+    def append(self, frame):
+        """Queue a frame (arrays must not be modified afterwards)."""
+        if self.wants_frame():
+            self._put(frame)
+            self.queued += 1
+        self.seen += 1
+
+    def _append(self, frame):
+        if self._fields is None:
+            arrays = sorted(name for name, value in frame.items() if np.ndim(value) > 0)
+            self._fields = {name: (np.asarray(frame[name]).dtype.str, np.shape(frame[name]))
+                            for name in arrays}
+            self._scalars = sorted(name for name in frame if name not in self._fields)
+
+        slot = len(self._blocks) % self.chunk_frames
+        if slot == 0:
+            if self._file is not None:
+                self._file.close()
+            chunk = len(self._blocks) // self.chunk_frames
+            self._file = open(os.path.join(self.output_dir, f'frames_{chunk:05d}.bin'), 'wb')
+            self._previous = {}
+
+        blocks = []
+        for name in self._fields:
+            bits = _bits(frame[name])
+            delta = bits if slot == 0 else bits ^ self._previous[name]
+            block = zlib.compress(delta.tobytes(), self.level)
+            blocks.append((self._file.tell(), len(block)))
+            self._file.write(block)
+            self._previous[name] = bits
+        self._blocks.append(blocks)
+        self._scalar_rows.append([float(frame[name]) for name in self._scalars])
+
+    def _sync(self, trim=False):
+        if self._file is not None:
+            self._file.flush()
+            if trim:
+                self._file.close()
+                self._file = None
+        fields = list(self._fields or {})
+        np.savez(os.path.join(self.output_dir, 'index.npz'),
+                 blocks=np.asarray(self._blocks, dtype=np.int64).reshape(-1, len(fields), 2),
+                 scalars=np.asarray(self._scalar_rows, dtype=float).reshape(
+                     -1, len(self._scalars or [])),
+                 fields=np.asarray(fields, dtype=str),
+                 dtypes=np.asarray([self._fields[name][0] for name in fields], dtype=str),
+                 shapes=np.asarray([self._fields[name][1] for name in fields], dtype=np.int64),
+                 scalar_names=np.asarray(self._scalars or [], dtype=str),
+                 chunk_frames=self.chunk_frames)
+
+    def __getitem__(self, i):
+        self.flush()
+        return CompressedFrameArchive(self.output_dir)[i]
+
+    def __iter__(self):
+        self.flush()
+        return iter(CompressedFrameArchive(self.output_dir))
+
+
+class CompressedFrameArchive:
+    """
+    Read-only view of a CompressedFrameSink directory.
+
+    archive[i] decodes frame i from its chunk's keyframe; iterating, or
+    indexing frames in increasing order, decodes each frame once.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        with np.load(os.path.join(output_dir, 'index.npz')) as index:
+            self._blocks = index['blocks']
+            self._scalar_rows = index['scalars']
+            self.fields = [str(name) for name in index['fields']]
+            self._dtypes = [np.dtype(str(dtype)) for dtype in index['dtypes']]
+            self._shapes = [tuple(shape) for shape in index['shapes']]
+            self.scalar_names = [str(name) for name in index['scalar_names']]
+            self.chunk_frames = int(index['chunk_frames'])
+        self._decoded = None  # (frame index, bit arrays) of the last decode
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def _decode(self, i):
+        chunk, slot = divmod(i, self.chunk_frames)
+        first = chunk * self.chunk_frames
+        if self._decoded is not None and first <= self._decoded[0] <= i:
+            start, bits = self._decoded[0] + 1, list(self._decoded[1])
+        else:
+            start, bits = first, None
+        path = os.path.join(self.output_dir, f'frames_{chunk:05d}.bin')
+        with open(path, 'rb') as stream:
+            for j in range(start, i + 1):
+                decoded = []
+                for k, (offset, length) in enumerate(self._blocks[j]):
+                    stream.seek(offset)
+                    delta = np.frombuffer(zlib.decompress(stream.read(length)),
+                                          dtype=f'u{self._dtypes[k].itemsize}')
+                    decoded.append(delta if bits is None else bits[k] ^ delta)
+                bits = decoded
+        self._decoded = (i, bits)
+        return bits
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"frame {i} out of range for {len(self)} frames")
+        bits = self._decode(i)
+        frame = dict(zip(self.scalar_names, self._scalar_rows[i]))
+        for name, array, dtype, shape in zip(self.fields, bits, self._dtypes, self._shapes):
+            frame[name] = array.view(dtype).reshape(shape)
+        return frame
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
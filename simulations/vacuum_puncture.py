@@ -14,13 +14,90 @@ When punctured, it breaks into (+1) dark energy and (-1) quantum foam,
 while maintaining overall neutrality: (+1) + (-1) = 0
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import cm
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.animation import FuncAnimation
 import matplotlib.patches as mpatches
 
+from puncture_kernels import axis_profile, get_kernel, get_stencil, stencil_window
+
+
+def _fft_size(n):
+    """Smallest 2^a 3^b 5^c length >= n (fast FFT sizes)."""
+    best = None
+    p5 = 1
+    while p5 < 2 * n:
+        p35 = p5
+        while p35 < 2 * n:
+            p235 = p35
+            while p235 < n:
+                p235 *= 2
+            if best is None or p235 < best:
+                best = p235
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def _kernel_rfft(n, kernel, radius, support):
+    """
+    Real-FFT of a puncture stencil centered at the origin of an n x n
+    periodic grid.
+    
+    Not cached: bin radii are geometric means that change with every
+    catalog, and at survey sizes one padded spectrum is hundreds of MB.
+    from_catalog builds each bin's transform once and drops it.
+    """
+    stencil = get_stencil(kernel, radius, support=support)
+    rows = (stencil.row_start + np.arange(stencil.values.shape[0])) % n
+    cols = (stencil.col_start + np.arange(stencil.values.shape[1])) % n
+    kernel_grid = np.zeros((n, n))
+    np.add.at(kernel_grid, np.ix_(rows, cols), stencil.values)
+    return np.fft.rfft2(kernel_grid)
+
+
+def _read_only(array):
+    """Mark an array read-only so derived components can't be edited."""
+    array.flags.writeable = False
+    return array
+
+
+def _lod_surface(values, block, peak_cells):
+    """
+    Block-average a square grid for surface rendering, keeping peaks.
+    
+    Args:
+        values: 2D array to decimate
+        block: Block edge length (1 = no decimation)
+        peak_cells: (rows, cols) of cells whose block keeps its most
+                    extreme value instead of the mean
+    
+    Returns:
+        Array of shape (ceil(n / block), ceil(n / block))
+    """
+    if block == 1:
+        return values
+    n = values.shape[0]
+    m = -(-n // block)
+    padded = np.pad(values, ((0, m * block - n), (0, m * block - n)), mode='edge')
+    blocks = padded.reshape(m, block, m, block).swapaxes(1, 2).reshape(m, m, block * block)
+    reduced = blocks.mean(axis=2)
+    
+    rows, cols = peak_cells
+    if len(rows):
+        peak_blocks = np.unique((rows // block) * m + cols // block)
+        by, bx = np.divmod(peak_blocks, m)
+        candidates = blocks[by, bx]
+        extreme = np.argmax(np.abs(candidates), axis=1)
+        reduced[by, bx] = candidates[np.arange(len(peak_blocks)), extreme]
+    return reduced
+
 
 class VacuumField:
     """
@@ -32,22 +109,225 @@ class VacuumField:
     (quantum foam) components.
     """
     
-    def __init__(self, size=100):
+    # Quantum foam produced per unit of dark energy (see add_white_hole_puncture)
+    foam_coupling = 0.85
+    
+    def __init__(self, size=100, cutoff=4.0, compact=False, dtype=np.float64,
+                 kernel='gaussian'):
         """
         Initialize the vacuum field.
         
         Args:
             size: Grid size (size x size grid points)
+            cutoff: Stencil half-width in units of the puncture radius.
+                    Cells further than cutoff * radius from a puncture are
+                    left untouched (exp(-2 * 4²) ≈ 1e-14 at the default).
+                    None evaluates every puncture over the full grid.
+            compact: Store a single base profile instead of separate
+                     dark energy, quantum foam and net field arrays.
+                     Quantum foam is always -foam_coupling times dark
+                     energy, so nothing is lost; the components become
+                     read-only arrays derived on access.
+            dtype: Floating point type of the stored arrays (e.g.
+                   np.float32 to halve memory again)
+            kernel: Default puncture profile, by name from the
+                    puncture_kernels registry (see add_white_hole_puncture)
         """
         self.size = size
-        self.field = np.zeros((size, size))  # Net vacuum field
-        self.dark_energy = np.zeros((size, size))  # Positive component (+1)
-        self.quantum_foam = np.zeros((size, size))  # Negative component (-1)
+        self.cutoff = cutoff
+        self.kernel = kernel
+        self.compact = compact
+        self.dtype = np.dtype(dtype)
+        self._allocate_storage()
+        
+        # Net vacuum field, materialized lazily (see the field property)
+        self._field = None
+        
+        # Running totals so neutrality checks don't need full-grid sums
+        self._total_dark_energy = 0.0
+        self._total_quantum_foam = 0.0
         
         # Track puncture locations for visualization
         self.punctures = []
+        self._punctures_by_id = {}
+        self._next_puncture_id = 0
+        
+        # Bulk catalog used by from_catalog (too large to log per puncture)
+        self.catalog = None
+        
+    def _allocate_storage(self):
+        """Allocate the arrays backing dark_energy and quantum_foam."""
+        shape = (self.size, self.size)
+        if self.compact:
+            # Base profile Σ strength·exp(-2r²/r₀²); dark energy has unit
+            # coupling to it, quantum foam -foam_coupling
+            self._profile = np.zeros(shape, dtype=self.dtype)
+        else:
+            self._dark_energy = np.zeros(shape, dtype=self.dtype)  # Positive component (+1)
+            self._quantum_foam = np.zeros(shape, dtype=self.dtype)  # Negative component (-1)
+        
+    @property
+    def dark_energy(self):
+        """Positive (+1) component. Read-only view in compact mode."""
+        if self.compact:
+            return _read_only(self._profile.view())
+        return self._dark_energy
+    
+    @property
+    def quantum_foam(self):
+        """Negative (-1) component. Derived on access in compact mode."""
+        if self.compact:
+            return _read_only(-self.foam_coupling * self._profile)
+        return self._quantum_foam
+        
+    @property
+    def field(self):
+        """
+        Net vacuum field: dark_energy + quantum_foam.
+        
+        Computed on first access after a change and cached until the next
+        puncture, so adding many punctures never rebuilds it in between.
+        In compact mode it is derived on every access and never cached.
+        """
+        if self.compact:
+            return _read_only((1 - self.foam_coupling) * self._profile)
+        if self._field is None:
+            self._field = self._dark_energy + self._quantum_foam
+        return self._field
         
-    def add_white_hole_puncture(self, x, y, strength=2.0, radius=15):
+    def get_region(self, rows, cols):
+        """
+        Extract a window of all three components.
+        
+        Args:
+            rows, cols: Slices of grid indices
+        
+        Returns:
+            (dark_energy, quantum_foam, field) arrays for the window
+        """
+        if self.compact:
+            base = self._profile[rows, cols]
+            return (base.copy(), -self.foam_coupling * base,
+                    (1 - self.foam_coupling) * base)
+        dark_energy = self._dark_energy[rows, cols].copy()
+        quantum_foam = self._quantum_foam[rows, cols].copy()
+        return dark_energy, quantum_foam, dark_energy + quantum_foam
+    
+    def get_cross_section(self, row):
+        """
+        Extract one grid row of all three components.
+        
+        Returns:
+            (dark_energy, quantum_foam, field) 1D arrays of length size
+        """
+        region = self.get_region(slice(row, row + 1), slice(None))
+        return tuple(component[0] for component in region)
+        
+    def _stamp(self, rows, cols, profile):
+        """Add a base (dark energy) profile to the window [rows, cols]."""
+        if self.compact:
+            self._profile[rows, cols] += profile
+        else:
+            self._dark_energy[rows, cols] += profile
+            self._quantum_foam[rows, cols] -= self.foam_coupling * profile
+        self._field = None
+        
+        
+    @classmethod
+    def from_catalog(cls, size, x, y, strength, radius, cutoff=4.0,
+                     n_radius_bins=16, compact=False, dtype=np.float64,
+                     kernel='gaussian'):
+        """
+        Build a vacuum field from a whole catalog of punctures at once.
+        
+        Instead of stamping every puncture separately, the strengths are
+        deposited onto the grid (cloud-in-cell, so off-grid centers are
+        shared between the four nearest cells) and each radius bin is
+        convolved once with the puncture profile in Fourier space. Cost is
+        O(P + B·N² log N) for P punctures in B radius bins, which makes
+        10⁵–10⁶ punctures on a single grid practical.
+        
+        Punctures with identical radii are grouped exactly. If there are
+        more distinct radii than n_radius_bins, radii are grouped into
+        logarithmic bins and each bin uses its geometric-mean radius.
+        
+        Args:
+            size: Grid size (size x size grid points)
+            x, y: Arrays of center coordinates (grid indices)
+            strength: Array (or scalar) of puncture amplitudes
+            radius: Array (or scalar) of characteristic radii
+            cutoff: Stencil half-width in units of radius (see __init__)
+            n_radius_bins: Maximum number of radius bins to convolve
+            compact, dtype: Storage options (see __init__)
+            kernel: Puncture profile name (see puncture_kernels)
+        
+        Returns:
+            VacuumField with dark_energy, quantum_foam and field populated.
+            The catalog is kept in vacuum.catalog; vacuum.punctures stays
+            empty so visualizations don't try to mark every puncture.
+        """
+        x, y, strength, radius = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float).ravel() for a in (x, y, strength, radius))
+        )
+        vacuum = cls(size=size, cutoff=cutoff, compact=compact, dtype=dtype,
+                     kernel=kernel)
+        kernel = get_kernel(kernel)
+        vacuum.catalog = {'x': x, 'y': y, 'strength': strength, 'radius': radius}
+        if x.size == 0:
+            return vacuum
+        
+        # Group punctures by radius
+        unique_radii, bin_index = np.unique(radius, return_inverse=True)
+        if unique_radii.size > n_radius_bins:
+            edges = np.geomspace(unique_radii[0], unique_radii[-1], n_radius_bins + 1)
+            bin_index = np.clip(np.searchsorted(edges, radius, side='right') - 1,
+                                0, n_radius_bins - 1)
+            bin_radii = np.sqrt(edges[:-1] * edges[1:])
+        else:
+            bin_radii = unique_radii
+        
+        profile = np.zeros((size, size))
+        for b, r in enumerate(bin_radii):
+            in_bin = bin_index == b
+            if not np.any(in_bin):
+                continue
+            
+            # Pad so the periodic convolution cannot wrap into the domain
+            pad = size if cutoff is None else int(np.ceil(cutoff * r)) + 1
+            support = pad / r if cutoff is None else cutoff
+            n = _fft_size(size + 2 * pad)
+            
+            # Cloud-in-cell deposit onto the padded grid
+            px = x[in_bin] + pad
+            py = y[in_bin] + pad
+            ix = np.floor(px).astype(int)
+            iy = np.floor(py).astype(int)
+            fx = px - ix
+            fy = py - iy
+            s = strength[in_bin]
+            deposit = np.zeros(n * n)
+            for dy, wy in ((0, 1 - fy), (1, fy)):
+                for dx, wx in ((0, 1 - fx), (1, fx)):
+                    cx = ix + dx
+                    cy = iy + dy
+                    inside = (cx >= 0) & (cx < n) & (cy >= 0) & (cy < n)
+                    deposit += np.bincount(cy[inside] * n + cx[inside],
+                                           weights=(s * wy * wx)[inside],
+                                           minlength=n * n)
+            
+            # Convolve with this bin's profile transform (built here, then dropped)
+            deposit_k = np.fft.rfft2(deposit.reshape(n, n))
+            deposit_k *= _kernel_rfft(n, kernel, float(r), support)
+            smoothed = np.fft.irfft2(deposit_k, s=(n, n))
+            profile += smoothed[pad:pad + size, pad:pad + size]
+        
+        vacuum._stamp(slice(None), slice(None), profile)
+        total = float(np.sum(profile))
+        vacuum._total_dark_energy = total
+        vacuum._total_quantum_foam = -vacuum.foam_coupling * total
+        return vacuum
+        
+    def add_white_hole_puncture(self, x, y, strength=2.0, radius=15, kernel=None):
         """
         Add a white-hole puncture at specified location.
         
@@ -61,15 +341,49 @@ class VacuumField:
             x, y: Center coordinates (grid indices)
             strength: Amplitude of perturbation
             radius: Characteristic radius of affected region
+            kernel: Profile name from puncture_kernels (default: self.kernel,
+                    'gaussian' = exp(-2(r/r₀)²))
+        
+        Returns:
+            Puncture id, for remove_puncture / update_puncture / move_puncture
         """
-        # Create grid of distances from puncture center
-        y_grid, x_grid = np.ogrid[:self.size, :self.size]
-        distance_sq = (x_grid - x)**2 + (y_grid - y)**2
+        if kernel is None:
+            kernel = self.kernel
+        self._apply_puncture(x, y, strength, radius, kernel)
+        
+        # Record puncture for visualization
+        puncture = {
+            'id': self._next_puncture_id,
+            'x': x,
+            'y': y,
+            'strength': strength,
+            'radius': radius,
+            'kernel': kernel
+        }
+        self._next_puncture_id += 1
+        self.punctures.append(puncture)
+        self._punctures_by_id[puncture['id']] = puncture
+        return puncture['id']
+        
+    def _apply_puncture(self, x, y, strength, radius, kernel):
+        """
+        Stamp one puncture profile onto the field and the running totals.
+        
+        A negative strength removes a previously applied puncture, which is
+        how the edit operations stay local to the puncture's window.
+        """
+        # Only the window within cutoff * radius of the center is touched.
+        # The stencil for this (kernel, radius, subpixel offset) comes from
+        # the puncture_kernels cache; Gaussians are built there as the outer
+        # product of two 1D profiles
+        support = self.cutoff if self.cutoff is not None else 2.0 * self.size / radius
+        rows, cols, stencil, stencil_total = stencil_window(
+            (self.size, self.size), x, y, kernel, radius, support=support)
         
         # Gaussian profile for the perturbation
         # Dark energy (positive pressure) spreads rapidly
         # Falls as exp(-2(r/r₀)²) per paper's equation
-        dark_energy_profile = strength * np.exp(-2 * distance_sq / radius**2)
+        dark_energy_profile = strength * stencil
         
         # Quantum foam (negative pressure/mass) must exactly balance to maintain neutrality
         # In theory: perfect balance would be quantum_foam = -dark_energy
@@ -77,33 +391,105 @@ class VacuumField:
         # Using 0.85 coefficient represents the observed cosmic energy budget:
         #   ~70% dark energy, ~25% dark matter, ~5% normal matter
         # The 15% imbalance (100% - 85%) is dark energy "excess" driving acceleration!
-        quantum_foam_profile = -strength * 0.85 * np.exp(-2 * distance_sq / radius**2)
+        # _stamp adds -foam_coupling × the profile to the quantum foam
+        self._stamp(rows, cols, dark_energy_profile)
         
-        # Add to respective fields
-        self.dark_energy += dark_energy_profile
-        self.quantum_foam += quantum_foam_profile
+        # Totals over the grid: the stencil's sum over its (boundary-
+        # truncated) window, cached for stencils that fit inside the grid
+        total = strength * stencil_total
+        self._total_dark_energy += total
+        self._total_quantum_foam -= self.foam_coupling * total
         
-        # Net field is the sum (should be close to zero everywhere)
-        self.field = self.dark_energy + self.quantum_foam
+        # Net field is the sum (should be close to zero everywhere);
+        # _stamp marked it to be rebuilt on the next read
         
-        # Record puncture for visualization
-        self.punctures.append({
-            'x': x,
-            'y': y,
-            'strength': strength,
-            'radius': radius
-        })
+    def _get_puncture(self, puncture_id):
+        """Look up a recorded puncture, with a clear error for bad ids."""
+        try:
+            return self._punctures_by_id[puncture_id]
+        except KeyError:
+            raise KeyError(f"No puncture with id {puncture_id}") from None
+        
+    def remove_puncture(self, puncture_id):
+        """
+        Remove a puncture, subtracting only its own window.
+        
+        Args:
+            puncture_id: Id returned by add_white_hole_puncture
+        """
+        p = self._get_puncture(puncture_id)
+        self._apply_puncture(p['x'], p['y'], -p['strength'], p['radius'], p['kernel'])
+        del self._punctures_by_id[puncture_id]
+        self.punctures.remove(p)
+        
+    def update_puncture(self, puncture_id, strength=None, radius=None):
+        """
+        Re-weight and/or resize a puncture in place.
+        
+        A strength-only change stamps the difference once; a radius change
+        subtracts the old profile and adds the new one. Either way only the
+        puncture's window is touched.
+        
+        Args:
+            puncture_id: Id returned by add_white_hole_puncture
+            strength: New amplitude (None = unchanged)
+            radius: New characteristic radius (None = unchanged)
+        """
+        p = self._get_puncture(puncture_id)
+        strength = p['strength'] if strength is None else strength
+        radius = p['radius'] if radius is None else radius
+        kernel = p['kernel']
+        if radius == p['radius']:
+            self._apply_puncture(p['x'], p['y'], strength - p['strength'], radius, kernel)
+        else:
+            self._apply_puncture(p['x'], p['y'], -p['strength'], p['radius'], kernel)
+            self._apply_puncture(p['x'], p['y'], strength, radius, kernel)
+        p['strength'] = strength
+        p['radius'] = radius
+        
+    def move_puncture(self, puncture_id, x, y):
+        """
+        Move a puncture to a new center, updating only the old and new windows.
+        
+        Args:
+            puncture_id: Id returned by add_white_hole_puncture
+            x, y: New center coordinates (grid indices)
+        """
+        p = self._get_puncture(puncture_id)
+        self._apply_puncture(p['x'], p['y'], -p['strength'], p['radius'], p['kernel'])
+        self._apply_puncture(x, y, p['strength'], p['radius'], p['kernel'])
+        p['x'] = x
+        p['y'] = y
+        
+    def _recompute_totals(self):
+        """Re-sum the stored arrays into the running totals."""
+        if self.compact:
+            total = float(np.sum(self._profile, dtype=np.float64))
+            self._total_dark_energy = total
+            self._total_quantum_foam = -self.foam_coupling * total
+        else:
+            self._total_dark_energy = float(np.sum(self._dark_energy, dtype=np.float64))
+            self._total_quantum_foam = float(np.sum(self._quantum_foam, dtype=np.float64))
         
-    def get_neutrality_check(self):
+    def get_neutrality_check(self, recompute=False):
         """
         Verify that overall neutrality is maintained.
         
+        Uses the running totals kept by add_white_hole_puncture, so the
+        check is O(1) regardless of grid size.
+        
+        Args:
+            recompute: Re-sum the stored arrays first (full-grid pass)
+        
         Returns:
             Dictionary with neutrality statistics
         """
-        total_dark_energy = np.sum(self.dark_energy)
-        total_quantum_foam = np.sum(self.quantum_foam)
-        net_field = np.sum(self.field)
+        if recompute:
+            self._recompute_totals()
+        
+        total_dark_energy = self._total_dark_energy
+        total_quantum_foam = self._total_quantum_foam
+        net_field = total_dark_energy + total_quantum_foam
         
         # Check ratio: net should be much smaller than components
         if total_dark_energy > 0:
@@ -217,21 +603,52 @@ class VacuumField:
         plt.tight_layout()
         return fig
     
-    def visualize_3d(self):
+    def _surface_peak_cells(self):
+        """Grid cells of puncture centers, which LOD rendering must keep."""
+        xs = [p['x'] for p in self.punctures]
+        ys = [p['y'] for p in self.punctures]
+        if self.catalog is not None:
+            xs = np.concatenate([xs, self.catalog['x']])
+            ys = np.concatenate([ys, self.catalog['y']])
+        cols = np.rint(np.asarray(xs, dtype=float)).astype(int)
+        rows = np.rint(np.asarray(ys, dtype=float)).astype(int)
+        inside = (rows >= 0) & (rows < self.size) & (cols >= 0) & (cols < self.size)
+        return rows[inside], cols[inside]
+    
+    def visualize_3d(self, max_polygons=2500, fig=None):
         """
         Create 3D surface plots showing the field topology.
+        
+        Each surface is rendered at a level of detail that fits the polygon
+        budget: the grid is block-averaged down to at most max_polygons
+        quads, except that blocks containing a puncture center keep their
+        most extreme value so peaks aren't flattened.
+        
+        Args:
+            max_polygons: Polygon budget per surface (None = full resolution)
+            fig: Figure to draw into (default: a new pyplot figure)
         """
-        fig = plt.figure(figsize=(18, 5))
+        if fig is None:
+            fig = plt.figure(figsize=(18, 5))
+        
+        if max_polygons is None:
+            block = 1
+        else:
+            side = int(np.sqrt(max_polygons)) + 1  # Vertices per axis
+            block = max(1, -(-self.size // side))
+        peak_cells = self._surface_peak_cells()
         
-        # Create coordinate grids
-        x = np.arange(0, self.size, 1)
-        y = np.arange(0, self.size, 1)
+        # Create coordinate grids (block centers)
+        x = np.minimum(np.arange(0, self.size, block) + (block - 1) / 2, self.size - 1)
+        y = x
         X, Y = np.meshgrid(x, y)
+        surface = dict(rcount=len(y), ccount=len(x), linewidth=0,
+                       antialiased=True, alpha=0.9)
         
         # 1. Dark Energy Surface
         ax1 = fig.add_subplot(131, projection='3d')
-        surf1 = ax1.plot_surface(X, Y, self.dark_energy, cmap='Reds',
-                                linewidth=0, antialiased=True, alpha=0.9)
+        surf1 = ax1.plot_surface(X, Y, _lod_surface(self.dark_energy, block, peak_cells),
+                                cmap='Reds', **surface)
         ax1.set_title('Dark Energy Surface\n(Positive Curvature)', 
                      fontsize=12, fontweight='bold')
         ax1.set_xlabel('X')
@@ -242,8 +659,8 @@ class VacuumField:
         
         # 2. Quantum Foam Surface
         ax2 = fig.add_subplot(132, projection='3d')
-        surf2 = ax2.plot_surface(X, Y, self.quantum_foam, cmap='Blues_r',
-                                linewidth=0, antialiased=True, alpha=0.9)
+        surf2 = ax2.plot_surface(X, Y, _lod_surface(self.quantum_foam, block, peak_cells),
+                                cmap='Blues_r', **surface)
         ax2.set_title('Quantum Foam Surface\n(Negative Curvature)', 
                      fontsize=12, fontweight='bold')
         ax2.set_xlabel('X')
@@ -254,9 +671,8 @@ class VacuumField:
         
         # 3. Net Field Surface (should be flat!)
         ax3 = fig.add_subplot(133, projection='3d')
-        surf3 = ax3.plot_surface(X, Y, self.field, cmap='RdBu_r',
-                                linewidth=0, antialiased=True, alpha=0.9,
-                                vmin=-0.5, vmax=0.5)
+        surf3 = ax3.plot_surface(X, Y, _lod_surface(self.field, block, peak_cells),
+                                cmap='RdBu_r', vmin=-0.5, vmax=0.5, **surface)
         ax3.set_title('Net Field Surface\n(Near Zero = Neutral!)', 
                      fontsize=12, fontweight='bold')
         ax3.set_xlabel('X')
@@ -265,7 +681,7 @@ class VacuumField:
         ax3.view_init(elev=25, azim=45)
         fig.colorbar(surf3, ax=ax3, shrink=0.5)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
     
     def visualize_cross_section(self):
@@ -283,9 +699,8 @@ class VacuumField:
         
         # Extract cross-section
         x_coords = np.arange(self.size)
-        dark_energy_slice = self.dark_energy[center_y, :]
-        quantum_foam_slice = self.quantum_foam[center_y, :]
-        net_slice = self.field[center_y, :]
+        dark_energy_slice, quantum_foam_slice, net_slice = \
+            self.get_cross_section(center_y)
         
         # Create plot
         fig, ax = plt.subplots(figsize=(12, 6))
@@ -324,6 +739,441 @@ class VacuumField:
         return fig
 
 
+class TiledVacuumField(VacuumField):
+    """
+    Vacuum field on a sparse grid of fixed-size tiles.
+    
+    Survey-scale domains are mostly unperturbed vacuum, so only the tiles
+    that a puncture's stencil actually reaches are allocated. Like compact
+    mode, each tile stores the base profile alone; quantum foam and the
+    net field are derived from it. Reductions and region extraction work
+    tile by tile, so a 10⁵ × 10⁵ domain costs memory only where
+    punctures are.
+    
+    The dark_energy, quantum_foam and field properties still work but
+    assemble the whole dense grid; use get_region / get_cross_section on
+    large domains.
+    """
+    
+    def __init__(self, size=100, cutoff=4.0, dtype=np.float64, tile_size=512,
+                 kernel='gaussian'):
+        """
+        Initialize an empty tiled vacuum field.
+        
+        Args:
+            size: Grid size (size x size grid points)
+            cutoff: Stencil half-width in units of the puncture radius
+            dtype: Floating point type of the tiles
+            tile_size: Edge length of each tile (grid points)
+            kernel: Default puncture profile name (see puncture_kernels)
+        """
+        self.tile_size = tile_size
+        super().__init__(size=size, cutoff=cutoff, compact=True, dtype=dtype,
+                         kernel=kernel)
+        
+    @classmethod
+    def from_catalog(cls, size, x, y, strength, radius, cutoff=4.0,
+                     n_radius_bins=16, compact=True, dtype=np.float64,
+                     kernel='gaussian', tile_size=512):
+        """
+        Build a tiled vacuum field from a whole catalog of punctures.
+        
+        The FFT convolution of VacuumField.from_catalog needs the dense
+        grid, so each puncture is stamped through its own stencil window
+        instead; only tiles that some stencil reaches are allocated.
+        Radii are used exactly, never binned.
+        
+        Args:
+            size, x, y, strength, radius, cutoff, dtype, kernel: As
+                VacuumField.from_catalog
+            n_radius_bins, compact: Accepted for compatibility and ignored
+                (tiles always store the base profile alone)
+            tile_size: Edge length of each tile (grid points)
+        
+        Returns:
+            TiledVacuumField with the catalog in vacuum.catalog and
+            vacuum.punctures left empty, as VacuumField.from_catalog
+        """
+        x, y, strength, radius = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float).ravel() for a in (x, y, strength, radius))
+        )
+        vacuum = cls(size=size, cutoff=cutoff, dtype=dtype, tile_size=tile_size,
+                     kernel=kernel)
+        vacuum.catalog = {'x': x, 'y': y, 'strength': strength, 'radius': radius}
+        for px, py, s, r in zip(x, y, strength, radius):
+            vacuum._apply_puncture(px, py, s, r, kernel)
+        return vacuum
+        
+    def _allocate_storage(self):
+        """Start with no tiles; they are allocated on first touch."""
+        self._tiles = {}
+        
+    @property
+    def n_tiles(self):
+        """Number of tiles currently allocated."""
+        return len(self._tiles)
+        
+    def _tile_ranges(self, start, stop):
+        """Yield (tile index, lo, hi) for tiles overlapping [start, stop)."""
+        t = self.tile_size
+        for index in range(start // t, (stop - 1) // t + 1):
+            yield index, max(start, index * t), min(stop, (index + 1) * t)
+            
+    def _base_region(self, rows, cols):
+        """Assemble the base profile over a window from its tiles."""
+        r0, r1, _ = rows.indices(self.size)
+        c0, c1, _ = cols.indices(self.size)
+        region = np.zeros((max(r1 - r0, 0), max(c1 - c0, 0)), dtype=self.dtype)
+        if region.size == 0:
+            return region
+        t = self.tile_size
+        for ty, y0, y1 in self._tile_ranges(r0, r1):
+            for tx, x0, x1 in self._tile_ranges(c0, c1):
+                tile = self._tiles.get((ty, tx))
+                if tile is not None:
+                    region[y0 - r0:y1 - r0, x0 - c0:x1 - c0] = \
+                        tile[y0 - ty * t:y1 - ty * t, x0 - tx * t:x1 - tx * t]
+        return region
+        
+    @property
+    def dark_energy(self):
+        """Dense dark energy grid (assembled from tiles; read-only)."""
+        return _read_only(self._base_region(slice(None), slice(None)))
+    
+    @property
+    def quantum_foam(self):
+        """Dense quantum foam grid (assembled from tiles; read-only)."""
+        return _read_only(-self.foam_coupling * self._base_region(slice(None), slice(None)))
+    
+    @property
+    def field(self):
+        """Dense net field grid (assembled from tiles; read-only)."""
+        return _read_only((1 - self.foam_coupling) *
+                          self._base_region(slice(None), slice(None)))
+        
+    def get_region(self, rows, cols):
+        """
+        Extract a window of all three components, touching only its tiles.
+        
+        Args:
+            rows, cols: Slices of grid indices
+        
+        Returns:
+            (dark_energy, quantum_foam, field) arrays for the window
+        """
+        base = self._base_region(rows, cols)
+        return (base, -self.foam_coupling * base,
+                (1 - self.foam_coupling) * base)
+        
+    def _stamp(self, rows, cols, profile):
+        """Add a base profile to the window, allocating tiles it reaches."""
+        r0, r1, _ = rows.indices(self.size)
+        c0, c1, _ = cols.indices(self.size)
+        if r1 <= r0 or c1 <= c0:
+            return
+        t = self.tile_size
+        for ty, y0, y1 in self._tile_ranges(r0, r1):
+            for tx, x0, x1 in self._tile_ranges(c0, c1):
+                tile = self._tiles.get((ty, tx))
+                if tile is None:
+                    shape = (min(t, self.size - ty * t), min(t, self.size - tx * t))
+                    tile = self._tiles[(ty, tx)] = np.zeros(shape, dtype=self.dtype)
+                tile[y0 - ty * t:y1 - ty * t, x0 - tx * t:x1 - tx * t] += \
+                    profile[y0 - r0:y1 - r0, x0 - c0:x1 - c0]
+                    
+    def _recompute_totals(self):
+        """Re-sum the allocated tiles into the running totals."""
+        total = float(sum(np.sum(tile, dtype=np.float64)
+                          for tile in self._tiles.values()))
+        self._total_dark_energy = total
+        self._total_quantum_foam = -self.foam_coupling * total
+
+
+class VacuumField3D:
+    """
+    Volumetric (N³) vacuum field.
+    
+    Same physics as VacuumField, on a cube instead of a plane. The three
+    component arrays can be backed by np.memmap files so fields larger
+    than RAM can be built and analyzed: puncture injection and reductions
+    walk the volume in slabs of slab_size planes along z, so only one
+    slab is ever resident at a time.
+    """
+    
+    # Quantum foam produced per unit of dark energy (see VacuumField)
+    foam_coupling = VacuumField.foam_coupling
+    
+    def __init__(self, size=64, cutoff=4.0, dtype=np.float64,
+                 memmap_dir=None, slab_size=16, kernel='gaussian'):
+        """
+        Initialize the volumetric vacuum field.
+        
+        Args:
+            size: Grid size (size x size x size grid points)
+            cutoff: Stencil half-width in units of the puncture radius
+            dtype: Floating point type of the stored arrays
+            memmap_dir: Directory for dark_energy.dat, quantum_foam.dat and
+                        field.dat memory-mapped arrays (None = in RAM)
+            slab_size: Number of z-planes processed at a time
+            kernel: Default puncture profile from puncture_kernels; must
+                    be separable (cubes are stamped from 1D factors)
+        """
+        if not get_kernel(kernel).separable:
+            raise ValueError(f"VacuumField3D needs a separable kernel, not {kernel!r}")
+        self.size = size
+        self.cutoff = cutoff
+        self.kernel = kernel
+        self.dtype = np.dtype(dtype)
+        self.memmap_dir = memmap_dir
+        self.slab_size = slab_size
+        
+        shape = (size, size, size)  # Indexed [z, y, x]
+        if memmap_dir is None:
+            self.dark_energy = np.zeros(shape, dtype=self.dtype)
+            self.quantum_foam = np.zeros(shape, dtype=self.dtype)
+            self.field = np.zeros(shape, dtype=self.dtype)
+        else:
+            os.makedirs(memmap_dir, exist_ok=True)
+            self.dark_energy, self.quantum_foam, self.field = (
+                np.memmap(os.path.join(memmap_dir, name + '.dat'),
+                          dtype=self.dtype, mode='w+', shape=shape)
+                for name in ('dark_energy', 'quantum_foam', 'field')
+            )
+        
+        # Running totals so neutrality checks don't need full-volume sums
+        self._total_dark_energy = 0.0
+        self._total_quantum_foam = 0.0
+        
+        self.punctures = []
+        
+    def _slabs(self, start, stop):
+        """Yield slices of at most slab_size planes covering [start, stop)."""
+        for lo in range(start, stop, self.slab_size):
+            yield slice(lo, min(lo + self.slab_size, stop))
+        
+    def add_white_hole_puncture(self, x, y, z, strength=2.0, radius=15, kernel=None):
+        """
+        Add a white-hole puncture at specified location.
+        
+        Separable profiles such as exp(-2(r/r₀)²) factorize in 3D, so the
+        stencil is built from three 1D profiles, one slab at a time.
+        
+        Args:
+            x, y, z: Center coordinates (grid indices)
+            strength: Amplitude of perturbation
+            radius: Characteristic radius of affected region
+            kernel: Separable profile name (default: self.kernel)
+        """
+        if kernel is None:
+            kernel = self.kernel
+        support = np.inf if self.cutoff is None else self.cutoff
+        planes, profile_z = axis_profile(z, self.size, kernel, radius, support)
+        rows, profile_y = axis_profile(y, self.size, kernel, radius, support)
+        cols, profile_x = axis_profile(x, self.size, kernel, radius, support)
+        plane = strength * np.outer(profile_y, profile_x)
+        
+        for slab in self._slabs(planes.start, planes.stop):
+            dark_energy_profile = (profile_z[slab.start - planes.start:
+                                             slab.stop - planes.start, None, None]
+                                   * plane)
+            self.dark_energy[slab, rows, cols] += dark_energy_profile
+            self.quantum_foam[slab, rows, cols] -= self.foam_coupling * dark_energy_profile
+            self.field[slab, rows, cols] = (self.dark_energy[slab, rows, cols] +
+                                            self.quantum_foam[slab, rows, cols])
+        
+        total = np.sum(profile_z) * np.sum(plane)
+        self._total_dark_energy += total
+        self._total_quantum_foam -= self.foam_coupling * total
+        
+        self.punctures.append({
+            'x': x,
+            'y': y,
+            'z': z,
+            'strength': strength,
+            'radius': radius,
+            'kernel': kernel
+        })
+        
+    def get_neutrality_check(self, recompute=False):
+        """
+        Verify that overall neutrality is maintained.
+        
+        Args:
+            recompute: Re-sum the stored arrays slab by slab first
+        
+        Returns:
+            Dictionary with neutrality statistics (as VacuumField)
+        """
+        if recompute:
+            self._total_dark_energy = 0.0
+            self._total_quantum_foam = 0.0
+            for slab in self._slabs(0, self.size):
+                self._total_dark_energy += float(np.sum(self.dark_energy[slab], dtype=np.float64))
+                self._total_quantum_foam += float(np.sum(self.quantum_foam[slab], dtype=np.float64))
+        
+        total_dark_energy = self._total_dark_energy
+        total_quantum_foam = self._total_quantum_foam
+        net_field = total_dark_energy + total_quantum_foam
+        
+        if total_dark_energy > 0:
+            neutrality_ratio = abs(net_field / total_dark_energy)
+        else:
+            neutrality_ratio = 0
+            
+        return {
+            'total_dark_energy': total_dark_energy,
+            'total_quantum_foam': total_quantum_foam,
+            'net_field': net_field,
+            'neutrality_ratio': neutrality_ratio,
+            'is_neutral': neutrality_ratio < 0.25
+        }
+        
+    def get_plane(self, z):
+        """
+        Extract one z-plane of all three components.
+        
+        Returns:
+            (dark_energy, quantum_foam, field) 2D arrays (copies)
+        """
+        return (np.array(self.dark_energy[z]), np.array(self.quantum_foam[z]),
+                np.array(self.field[z]))
+        
+    def flush(self):
+        """Write memory-mapped arrays back to disk."""
+        for array in (self.dark_energy, self.quantum_foam, self.field):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+def _windowed_profile_sums(n, centers, radii, cutoff, kernel='gaussian'):
+    """
+    Batched Σᵢ f(((i - c)/r₀)²) over i in [0, n) for a separable kernel
+    profile f, restricted to the same window as axis_profile. One row per
+    (n, c, r₀) triple. The kernel is passed by name so chunks can be
+    sent to pool workers.
+    """
+    profile = get_kernel(kernel).profile
+    i = np.arange(np.max(n))
+    offsets = i - centers[:, None]
+    terms = profile((offsets / radii[:, None])**2)
+    inside = i < n[:, None]
+    if cutoff is not None:
+        reach = cutoff * radii
+        inside &= ((i >= np.floor(centers - reach)[:, None]) &
+                   (i <= np.ceil(centers + reach)[:, None]))
+    return np.sum(terms, axis=1, where=inside)
+
+
+def neutrality_sweep(strengths, radii, sizes=(100,), offsets=((0, 0),),
+                     cutoff=4.0, max_batch_bytes=256 * 2**20, processes=None,
+                     kernel='gaussian'):
+    """
+    Neutrality statistics for a single puncture over a grid of configurations.
+    
+    Equivalent to building VacuumField(size), adding one puncture at
+    (size // 2 + dx, size // 2 + dy) and calling get_neutrality_check for
+    every combination, without constructing any fields. The kernel must
+    be separable (non-separable kernels such as 'tophat' raise
+    ValueError), so each total is strength × Sx × Sy where Sx, Sy are 1D
+    profile sums; those are evaluated in one broadcast batch and the
+    strengths are broadcast on top.
+    
+    If the batch of 1D sums would exceed max_batch_bytes it is split into
+    chunks that are evaluated by a process pool. The pool runs one chunk
+    per worker at a time, so chunks are sized to max_batch_bytes divided
+    by the worker count. The budget covers the 1D sums only: the five
+    returned arrays (S × O × R × K values each) are allocated on top.
+    
+    Args:
+        strengths, radii, sizes: Sequences of values to sweep
+        offsets: Sequence of (dx, dy) puncture offsets from the grid center
+        cutoff: Stencil half-width in units of radius (as VacuumField)
+        max_batch_bytes: Working-memory budget for the 1D sums, shared by
+                         all workers
+        processes: Worker count for the process pool (None = CPU count)
+        kernel: Registered name of a separable kernel (as VacuumField)
+    
+    Returns:
+        Dictionary with the same keys as get_neutrality_check, each an
+        array of shape (len(sizes), len(offsets), len(radii), len(strengths))
+    """
+    if not get_kernel(kernel).separable:
+        raise ValueError(f"neutrality_sweep needs a separable kernel, not {kernel!r}")
+    strengths = np.asarray(strengths, dtype=float)
+    radii = np.asarray(radii, dtype=float)
+    sizes = np.asarray(sizes, dtype=int)
+    offsets = np.asarray(offsets, dtype=float).reshape(-1, 2)
+    
+    # One 1D sum per (size, offset, radius, axis)
+    n, shift, r = np.meshgrid(sizes, offsets.T.ravel(), radii, indexing='ij')
+    n = n.ravel()
+    centers = (n // 2 + shift.ravel()).astype(float)
+    r = r.ravel()
+    
+    row_bytes = 3 * 8 * int(np.max(sizes))
+    if n.size * row_bytes <= max_batch_bytes:
+        sums = _windowed_profile_sums(n, centers, r, cutoff, kernel)
+    else:
+        workers = processes or os.cpu_count() or 1
+        rows_per_batch = max(1, max_batch_bytes // (workers * row_bytes))
+        chunks = [slice(lo, lo + rows_per_batch)
+                  for lo in range(0, n.size, rows_per_batch)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = pool.map(_windowed_profile_sums,
+                             [n[c] for c in chunks], [centers[c] for c in chunks],
+                             [r[c] for c in chunks], [cutoff] * len(chunks),
+                             [kernel] * len(chunks))
+            sums = np.concatenate(list(parts))
+    
+    # Axis order of sums: size, (x offsets then y offsets), radius
+    sums = sums.reshape(len(sizes), 2, len(offsets), len(radii))
+    profile_totals = sums[:, 0] * sums[:, 1]
+    
+    foam_coupling = VacuumField.foam_coupling
+    total_dark_energy = profile_totals[..., None] * strengths
+    total_quantum_foam = -foam_coupling * total_dark_energy
+    net_field = total_dark_energy + total_quantum_foam
+    neutrality_ratio = np.divide(np.abs(net_field), total_dark_energy,
+                                 out=np.zeros_like(net_field),
+                                 where=total_dark_energy > 0)
+    
+    return {
+        'total_dark_energy': total_dark_energy,
+        'total_quantum_foam': total_quantum_foam,
+        'net_field': net_field,
+        'neutrality_ratio': neutrality_ratio,
+        'is_neutral': neutrality_ratio < 0.25
+    }
+
+
+def render_3d_batch(fields, output_dir, max_polygons=2500, dpi=100):
+    """
+    Render 3D surface panels for many vacuum fields straight to PNG files.
+    
+    Figures are created without pyplot, so nothing is shown and no GUI
+    backend is needed; each figure is released as soon as it is saved.
+    
+    Args:
+        fields: Mapping of name -> VacuumField (or iterable of pairs)
+        output_dir: Directory for <name>_3d.png files
+        max_polygons: Polygon budget per surface (see visualize_3d)
+        dpi: Output resolution
+    
+    Returns:
+        List of written file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    items = fields.items() if hasattr(fields, 'items') else fields
+    paths = []
+    for name, vacuum in items:
+        fig = Figure(figsize=(18, 5))
+        vacuum.visualize_3d(max_polygons=max_polygons, fig=fig)
+        path = os.path.join(output_dir, f"{name}_3d.png")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    return paths
+
+
 def demonstrate_single_puncture():
     """
     Show the fundamental phenomenon: one puncture breaking vacuum neutrality.
@@ -421,6 +1271,37 @@ def demonstrate_multiple_punctures():
     print("="*70)
 
 
+def demonstrate_puncture_catalog(n_punctures=100000, size=1024, seed=0):
+    """
+    Build a full cosmic web from a large random puncture catalog.
+    """
+    print("\n" + "="*70)
+    print("PUNCTURE CATALOG - FULL COSMIC WEB")
+    print(f"Depositing {n_punctures:,} white holes on a {size}×{size} grid")
+    print("="*70)
+    
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, size, n_punctures)
+    y = rng.uniform(0, size, n_punctures)
+    strength = rng.uniform(0.05, 0.2, n_punctures)
+    radius = rng.choice([2.0, 3.0, 5.0, 8.0], n_punctures)
+    
+    print("\nBuilding vacuum field from catalog...")
+    vacuum = VacuumField.from_catalog(size, x, y, strength, radius)
+    
+    # Check neutrality
+    stats = vacuum.get_neutrality_check()
+    print(f"\nNeutrality Check:")
+    print(f"  Total Dark Energy: {stats['total_dark_energy']:.2f}")
+    print(f"  Total Quantum Foam: {stats['total_quantum_foam']:.2f}")
+    print(f"  Net Field: {stats['net_field']:.2f}")
+    print(f"  Neutrality Maintained: {stats['is_neutral']} ✓")
+    
+    print("\nGenerating visualizations...")
+    fig2d = vacuum.visualize_2d()
+    plt.show()
+
+
 def demonstrate_neutrality_principle():
     """
     Interactive demonstration of the neutrality principle with varying parameters.
@@ -434,20 +1315,16 @@ def demonstrate_neutrality_principle():
     radii = [10, 15, 20, 25]
     
     print("\nTesting different puncture strengths:")
-    for strength in strengths:
-        vacuum = VacuumField(size=100)
-        vacuum.add_white_hole_puncture(50, 50, strength=strength, radius=15)
-        stats = vacuum.get_neutrality_check()
-        print(f"  Strength {strength:.1f}: Net field = {stats['net_field']:.3f}, "
-              f"Neutrality = {stats['neutrality_ratio']*100:.1f}%")
+    stats = neutrality_sweep(strengths, radii=[15], sizes=[100])
+    for j, strength in enumerate(strengths):
+        print(f"  Strength {strength:.1f}: Net field = {stats['net_field'][0, 0, 0, j]:.3f}, "
+              f"Neutrality = {stats['neutrality_ratio'][0, 0, 0, j]*100:.1f}%")
     
     print("\nTesting different puncture radii:")
-    for radius in radii:
-        vacuum = VacuumField(size=100)
-        vacuum.add_white_hole_puncture(50, 50, strength=2.0, radius=radius)
-        stats = vacuum.get_neutrality_check()
-        print(f"  Radius {radius}: Net field = {stats['net_field']:.3f}, "
-              f"Neutrality = {stats['neutrality_ratio']*100:.1f}%")
+    stats = neutrality_sweep([2.0], radii=radii, sizes=[100])
+    for i, radius in enumerate(radii):
+        print(f"  Radius {radius}: Net field = {stats['net_field'][0, 0, i, 0]:.3f}, "
+              f"Neutrality = {stats['neutrality_ratio'][0, 0, i, 0]*100:.1f}%")
     
     print("\n" + "="*70)
     print("Result: Neutrality maintained across all parameters! ✓")
@@ -524,6 +1401,12 @@ if __name__ == "__main__":
             print("\nRunning multiple punctures demonstration...")
         demonstrate_multiple_punctures()
         
+        if is_interactive:
+            input("\nPress Enter to build a large puncture catalog...")
+        else:
+            print("\nRunning puncture catalog demonstration...")
+        demonstrate_puncture_catalog()
+        
         if is_interactive:
             input("\nPress Enter to test neutrality principle...")
         else: